@@ -2,12 +2,12 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
+from sklearn.preprocessing import OrdinalEncoder
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
 
 # Page config
 st.set_page_config(
@@ -25,7 +25,48 @@ uploaded_file = st.file_uploader("📁 Upload DLD CSV", type=['csv'])
 if uploaded_file is not None:
     @st.cache_data
     def load_data(file):
-        return pd.read_csv(file)
+        df = pd.read_csv(file, dtype={'AREA_EN': 'category'})
+        # Narrow numeric columns: floats go to float32 only when every value round-trips exactly;
+        # integer downcasting is range-checked and exact
+        for c in ['TRANS_VALUE', 'PROCEDURE_AREA', 'ACTUAL_AREA']:
+            if pd.api.types.is_numeric_dtype(df[c]):
+                narrowed = df[c].astype(np.float32)
+                if narrowed.astype(df[c].dtype).equals(df[c]):
+                    df[c] = narrowed
+        for c in ['ROOMS_EN', 'PARKING']:
+            if pd.api.types.is_integer_dtype(df[c]):
+                df[c] = pd.to_numeric(df[c], downcast='integer')
+        return df
+    
+    # Per-area totals over the whole upload; the area filter only selects rows of this Series.
+    # Keyed on the upload's file_id so the frame itself is never hashed.
+    @st.cache_data
+    def area_totals(_df, file_id):
+        return _df.groupby('AREA_EN', observed=True)['TRANS_VALUE'].sum()
+    
+    # Trained model lives in the resource cache, so widget reruns reuse it instead of refitting.
+    # The cache is shared across sessions, so bound it to recent filter combinations.
+    @st.cache_resource(max_entries=16, ttl=3600)
+    def fit_model(X, y):
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        
+        # Pipeline - histogram GBDT bins each feature once; trees are scale-invariant, so no scaler.
+        # The area code (last column) is split on natively as a categorical; rare areas share one
+        # category so the cardinality stays within max_bins, and unseen areas count as missing.
+        area_encoder = OrdinalEncoder(
+            max_categories=64, handle_unknown='use_encoded_value', unknown_value=np.nan, dtype=np.float32
+        )
+        pipe = Pipeline([
+            ('pre', ColumnTransformer([('area', area_encoder, [X.shape[1] - 1])], remainder='passthrough')),
+            ('gbdt', HistGradientBoostingRegressor(
+                max_iter=200, max_bins=64, categorical_features=[0], early_stopping=True, random_state=42
+            ))
+        ])
+        
+        pipe.fit(X_train, y_train)
+        # HistGradientBoosting has no impurity-based feature_importances_, so measure on the test split
+        importances = permutation_importance(pipe, X_test, y_test, n_repeats=5, random_state=42).importances_mean
+        return pipe, pipe.score(X_test, y_test), importances
     
     df = load_data(uploaded_file)
     st.success(f"✅ Loaded {len(df)} transactions")
@@ -42,10 +83,11 @@ if uploaded_file is not None:
     area_filter = st.sidebar.multiselect("Area", df['AREA_EN'].unique())
     date_range = st.sidebar.date_input("Date Range", [])
     
-    # Filter data
-    filtered_df = df.copy()
+    # Filter data - build the mask first and only materialize rows when a filter actually drops some
+    mask = np.ones(len(df), dtype=bool)
     if area_filter:
-        filtered_df = filtered_df[filtered_df['AREA_EN'].isin(area_filter)]
+        mask &= df['AREA_EN'].isin(area_filter).to_numpy()
+    filtered_df = df if mask.all() else df.loc[mask]
     
     # Charts
     col1, col2 = st.columns(2)
@@ -69,28 +111,28 @@ if uploaded_file is not None:
     
     # Top areas table
     st.subheader("🏆 Top 10 Areas by Transaction Value")
-    top_areas = filtered_df.groupby('AREA_EN')['TRANS_VALUE'].sum().sort_values(Descending=True).head(10)
+    totals = area_totals(df, uploaded_file.file_id)
+    if area_filter:
+        totals = totals[totals.index.isin(area_filter)]
+    top_areas = totals.sort_values(ascending=False).head(10)
     st.dataframe(top_areas, use_container_width=True)
     
     # ML Section
     st.subheader("🤖 HNWI Price Predictor")
     
     # Prepare ML data
-    ml_df = filtered_df[['PROCEDURE_AREA', 'ACTUAL_AREA', 'ROOMS_EN', 'PARKING']].dropna()
-    X = ml_df[['PROCEDURE_AREA', 'ACTUAL_AREA', 'ROOMS_EN', 'PARKING']]
-    y = ml_df['TRANS_VALUE']
+    feature_cols = ['PROCEDURE_AREA', 'ACTUAL_AREA', 'ROOMS_EN', 'PARKING']
+    ml_df = filtered_df[feature_cols + ['AREA_EN', 'TRANS_VALUE']].dropna()
+    # Contiguous float32 feature matrix - half the bytes of a float64 frame to split, hash and bin.
+    # AREA_EN goes in as its category code, which the model treats as a categorical feature.
+    X = np.column_stack([
+        ml_df[feature_cols].to_numpy(dtype=np.float32),
+        ml_df['AREA_EN'].cat.codes.to_numpy(dtype=np.float32)
+    ])
+    y = ml_df['TRANS_VALUE'].to_numpy()
     
     if len(X) > 10:
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Pipeline
-        pipe = Pipeline([
-            ('scaler', StandardScaler()),
-            ('rf', RandomForestRegressor(n_estimators=100, random_state=42))
-        ])
-        
-        pipe.fit(X_train, y_train)
-        score = pipe.score(X_test, y_test)
+        pipe, score, importances = fit_model(X, y)
         
         st.info(f"✅ Model R² Score: **{score:.2%}**")
         
@@ -101,19 +143,21 @@ if uploaded_file is not None:
             actual_area = st.number_input("Actual Area (sqm)", 20.0, 5000.0, 100.0)
             rooms = st.number_input("Rooms", 0, 10, 3)
             parking = st.selectbox("Parking", [0, 1])
+            area_categories = df['AREA_EN'].cat.categories
+            area_name = st.selectbox("Area", area_categories)
             
             if st.button("🚀 Predict Price"):
-                pred = pipe.predict([[area, actual_area, rooms, parking]])[0]
+                area_code = area_categories.get_loc(area_name)
+                pred = pipe.predict([[area, actual_area, rooms, parking, area_code]])[0]
                 st.success(f"**Predicted Price: AED {pred:,.0f}**")
                 st.info(f"💡 Confidence: High (R² {score:.1%})")
     
     # Feature importance
     st.subheader("📊 Feature Importance")
     if len(X) > 10:
-        rf = pipe.named_steps['rf']
         importance = pd.DataFrame({
-            'feature': X.columns,
-            'importance': rf.feature_importances_
+            'feature': feature_cols + ['AREA_EN'],
+            'importance': importances
         }).sort_values('importance', ascending=False)
         
         fig_imp = px.bar(importance, x='importance', y='feature', 
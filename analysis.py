@@ -6,6 +6,7 @@ import seaborn as sns
 import plotly.express as px
 import os
 from dotenv import load_dotenv
+from parquet_cache import read_or_build_sidecar
 
 
 plt.style.use('fivethirtyeight')
@@ -14,7 +15,25 @@ color_palette = plt.rcParams['axes.prop_cycle'].by_key()['color']
 load_dotenv()
 fred_key = os.getenv('fred_api_key')
 fred = Fred(api_key=fred_key)
-series = fred.get_series('RSXFSN')
+
+# Fred responses are cached on disk for an hour, so re-running the script skips the network round-trips
+FRED_CACHE_DIR = '.fred_cache'
+FRED_CACHE_TTL = 3600
+os.makedirs(FRED_CACHE_DIR, exist_ok=True)
+
+
+def get_fred_series(series_id):
+    cached = read_or_build_sidecar(os.path.join(FRED_CACHE_DIR, series_id),
+                                   lambda: fred.get_series(series_id).to_frame('Value'), 1, max_age=FRED_CACHE_TTL)
+    return cached['Value']
+
+
+def search_fred(query):
+    return read_or_build_sidecar(os.path.join(FRED_CACHE_DIR, 'search-' + query.replace(' ', '_')),
+                                 lambda: fred.search(query), 1, max_age=FRED_CACHE_TTL)
+
+
+series = get_fred_series('RSXFSN')
 df = pd.DataFrame(series, columns=['Value'])
 df['Date'] = df.index
 df = df.reset_index()
@@ -30,7 +49,7 @@ df['Date'] = pd.to_datetime(df['Date'])
 # plt.grid(True)
 # plt.show()
 
-unemp_results=fred.search('Unemployment Rate')
-unrate=fred.get_series('UNRATE')
+unemp_results=search_fred('Unemployment Rate')
+unrate=get_fred_series('UNRATE')
 unrate.plot()
 plt.show()
\ No newline at end of file
@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+import numpy as np
 import plotly.express as px
-from datetime import datetime
+import plotly.graph_objects as go
+from datetime import datetime, timedelta
+from functools import reduce
+from parquet_cache import read_or_build_sidecar
 
 # Page config - Luxury & Modern Theme
 st.set_page_config(
@@ -23,25 +25,151 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-sns.set(style="darkgrid", palette="Blues")
+SIDECAR_VERSION = 1  # Bump whenever parse_transactions changes the columns, dtypes or row order it produces
 
-# Load data with caching
-@st.cache_data
-def load_data():
-    df = pd.read_csv("transactions-2025-12-20.csv")
+def parse_transactions(path):
+    # Repetitive text columns are parsed straight into categoricals (int codes + lookup table)
+    df = pd.read_csv(
+        path,
+        dtype={c: 'category' for c in ['AREA_EN', 'PROP_TYPE_EN', 'ROOMS_EN', 'PROJECT_EN']}
+    )
     
-    # Convert date
+    # Convert date and keep rows in date order, so date filters are a binary search (NaT last, as NumPy sorts it)
     df['INSTANCE_DATE'] = pd.to_datetime(df['INSTANCE_DATE'], errors='coerce')
+    df = df.sort_values('INSTANCE_DATE', na_position='last', kind='stable').reset_index(drop=True)
+    
+    # Shrink numeric columns to float32, but only when every value round-trips exactly
+    for c in ['TRANS_VALUE', 'PROCEDURE_AREA', 'ACTUAL_AREA']:
+        narrowed = df[c].astype(np.float32)
+        if narrowed.astype(df[c].dtype).equals(df[c]):
+            df[c] = narrowed
     
     # Key calculated metrics (based on 2025 market insights)
-    df['meter_price'] = df['TRANS_VALUE'] / df['PROCEDURE_AREA']
-    df['yield_est'] = 0.065  # Average gross yield ~6.5% in 2025
-    df['appreciation_est'] = 0.156  # Average capital appreciation ~15.6%
-    df['roi_est'] = df['yield_est'] + df['appreciation_est'] - (20 / df['PROCEDURE_AREA']) / df['meter_price']  # Approx net ROI
+    yield_est = 0.065  # Average gross yield ~6.5% in 2025
+    appreciation_est = 0.156  # Average capital appreciation ~15.6%
+    trans_value = df['TRANS_VALUE'].to_numpy()
+    # Zero areas/values yield inf/NaN as pandas did, without NumPy's divide warnings
+    with np.errstate(divide='ignore', invalid='ignore'):
+        meter_price = trans_value / df['PROCEDURE_AREA'].to_numpy()
+        # (20 / area) / meter_price reduces to 20 / value; rows without a finite meter price stay NaN as before
+        roi_est = np.where(np.isfinite(meter_price), (yield_est + appreciation_est) - 20 / trans_value, np.nan)
+    df['meter_price'] = meter_price
+    df['yield_est'] = yield_est
+    df['appreciation_est'] = appreciation_est
+    df['roi_est'] = roi_est  # Approx net ROI
     
     return df
 
-df = load_data()
+# Load data with caching; the parsed frame is also kept as a typed parquet sidecar next to the CSV
+@st.cache_data
+def load_data(path="transactions-2025-12-20.csv"):
+    df = read_or_build_sidecar(path, lambda: parse_transactions(path), SIDECAR_VERSION, source=path)
+    
+    # Daily value totals per area/type, so the monthly trend aggregates this small table instead of every row
+    daily_totals = df.groupby(
+        [pd.Grouper(key='INSTANCE_DATE', freq='D'), 'AREA_EN', 'PROP_TYPE_EN'], observed=True
+    ).agg(val_sum=('TRANS_VALUE', 'sum'), n=('TRANS_VALUE', 'count'))
+    
+    return df, daily_totals
+
+df, daily_totals = load_data()
+
+# Correlations are cached per filter signature (filter_key); the underscored frame is not hashed
+@st.cache_data(max_entries=32)
+def correlation_matrix(_numeric_df, filter_key):
+    return _numeric_df.astype(np.float32).corr()
+
+def filter_transactions(df, areas, prop_types, price_range, date_range):
+    # df is sorted by INSTANCE_DATE, so the date range is a contiguous slice found by binary search
+    # Search the datetime64 array itself so NumPy reconciles units (ns under pandas 2, us under pandas 3)
+    date_start = np.datetime64(date_range[0])
+    date_end = np.datetime64(date_range[1] + timedelta(days=1))  # inclusive of the whole last day
+    lo, hi = np.searchsorted(df['INSTANCE_DATE'].values, [date_start, date_end])
+    window = df.iloc[lo:hi]
+    
+    # Compare category codes and raw values so the remaining mask stays in NumPy
+    area_codes = pd.Categorical(areas, categories=df['AREA_EN'].cat.categories).codes
+    prop_type_codes = pd.Categorical(prop_types, categories=df['PROP_TYPE_EN'].cat.categories).codes
+    trans_values = window['TRANS_VALUE'].values
+    masks = [
+        np.isin(window['AREA_EN'].cat.codes.values, area_codes),
+        np.isin(window['PROP_TYPE_EN'].cat.codes.values, prop_type_codes),
+        (trans_values >= price_range[0]) & (trans_values <= price_range[1]),
+    ]
+    return window[reduce(np.logical_and, masks)]
+
+# Figures are cached per filter signature (filter_key); the underscored frames are not hashed
+@st.cache_data(max_entries=32)
+def build_area_bar(_filtered_df, filter_key):
+    area_avg = _filtered_df.groupby('AREA_EN', observed=True)['TRANS_VALUE'].mean().reset_index().sort_values('TRANS_VALUE', ascending=False)
+    fig = px.bar(
+        area_avg,
+        x='AREA_EN', y='TRANS_VALUE',
+        color='TRANS_VALUE',
+        color_continuous_scale='Blues',
+        title="Average Transaction Value by Area (AED)",
+        labels={'TRANS_VALUE': 'Average Value (AED)', 'AREA_EN': 'Area'}
+    )
+    fig.update_layout(xaxis_tickangle=-45, height=500, showlegend=False)
+    return fig
+
+@st.cache_data(max_entries=32)
+def build_monthly_trend(_filtered_df, _daily_totals, filter_key, price_filtered):
+    areas, prop_types, _, date_range = filter_key
+    if not price_filtered:
+        # No price filter: the pre-aggregated daily totals cover every other filter
+        days = _daily_totals.index.get_level_values('INSTANCE_DATE')
+        selected_days = _daily_totals[
+            _daily_totals.index.get_level_values('AREA_EN').isin(areas) &
+            _daily_totals.index.get_level_values('PROP_TYPE_EN').isin(prop_types) &
+            (days >= pd.Timestamp(date_range[0])) &
+            (days < pd.Timestamp(date_range[1]) + pd.Timedelta(days=1))
+        ]
+        monthly = selected_days.droplevel(['AREA_EN', 'PROP_TYPE_EN']).resample('ME')[['val_sum', 'n']].sum()
+        monthly_trend = (monthly['val_sum'] / monthly['n']).rename('TRANS_VALUE').reset_index()
+    else:
+        monthly_trend = _filtered_df.resample('ME', on='INSTANCE_DATE')['TRANS_VALUE'].mean().reset_index()
+    fig = px.line(
+        monthly_trend,
+        x='INSTANCE_DATE', y='TRANS_VALUE',
+        markers=True,
+        title="Monthly Average Transaction Value Trend (2025)",
+        labels={'TRANS_VALUE': 'Average Value (AED)', 'INSTANCE_DATE': 'Date'}
+    )
+    fig.update_traces(line=dict(color='#00b7eb', width=4))
+    fig.update_layout(height=500)
+    return fig
+
+@st.cache_data(max_entries=32)
+def build_prop_type_box(_filtered_df, filter_key):
+    # Quartiles and 1.5 IQR whiskers are computed here, so only the box stats and outliers go to the browser
+    colors = px.colors.sequential.Blues_r
+    fig = go.Figure()
+    # sort=False keeps first-appearance order (and colours), as px.box did
+    grouped = _filtered_df.groupby('PROP_TYPE_EN', observed=True, sort=False)['TRANS_VALUE']
+    for i, (prop_type, values) in enumerate(grouped):
+        q1, median, q3 = values.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Box(
+            name=prop_type, x=[prop_type],
+            q1=[q1], median=[median], q3=[q3],
+            lowerfence=[values[inside].min()], upperfence=[values[inside].max()],
+            marker_color=color
+        ))
+        outliers = values[~inside]
+        fig.add_trace(go.Scatter(
+            x=[prop_type] * len(outliers), y=outliers,
+            mode='markers', marker_color=color, name=prop_type,
+            showlegend=False, hoverinfo='x+y'
+        ))
+    fig.update_layout(
+        title="Transaction Value Distribution by Property Type",
+        xaxis_title='Property Type', yaxis_title='Value (AED)',
+        xaxis_tickangle=-45, height=500, showlegend=False
+    )
+    return fig
 
 # Sidebar - Filters
 st.sidebar.header("Dubai Luxury Market Filters")
@@ -70,13 +198,8 @@ max_date = df['INSTANCE_DATE'].max().date()
 date_range = st.sidebar.date_input("Transaction Date Range", [min_date, max_date])
 
 # Apply filters
-filtered_df = df[
-    (df['AREA_EN'].isin(selected_areas)) &
-    (df['PROP_TYPE_EN'].isin(selected_prop_types)) &
-    (df['TRANS_VALUE'].between(price_range[0], price_range[1])) &
-    (df['INSTANCE_DATE'].dt.date >= date_range[0]) &
-    (df['INSTANCE_DATE'].dt.date <= date_range[1])
-]
+filtered_df = filter_transactions(df, selected_areas, selected_prop_types, price_range, date_range)
+filter_key = (tuple(selected_areas), tuple(selected_prop_types), tuple(price_range), tuple(date_range))
 
 # Main Dashboard Title
 st.title("🏙️ Dubai Luxury Real Estate Dashboard - December 2025")
@@ -106,51 +229,28 @@ with st.expander("Descriptive Statistics"):
 st.header("Market Insights & Trends")
 
 # 1. Average Transaction Value by Area
-area_avg = filtered_df.groupby('AREA_EN')['TRANS_VALUE'].mean().reset_index().sort_values('TRANS_VALUE', ascending=False)
-fig1 = px.bar(
-    area_avg,
-    x='AREA_EN', y='TRANS_VALUE',
-    color='TRANS_VALUE',
-    color_continuous_scale='Blues',
-    title="Average Transaction Value by Area (AED)",
-    labels={'TRANS_VALUE': 'Average Value (AED)', 'AREA_EN': 'Area'}
-)
-fig1.update_layout(xaxis_tickangle=-45, height=500, showlegend=False)
-st.plotly_chart(fig1, use_container_width=True)
+st.plotly_chart(build_area_bar(filtered_df, filter_key), use_container_width=True)
 
 # 2. Monthly Transaction Trend
-monthly_trend = filtered_df.resample('M', on='INSTANCE_DATE')['TRANS_VALUE'].mean().reset_index()
-fig2 = px.line(
-    monthly_trend,
-    x='INSTANCE_DATE', y='TRANS_VALUE',
-    markers=True,
-    title="Monthly Average Transaction Value Trend (2025)",
-    labels={'TRANS_VALUE': 'Average Value (AED)', 'INSTANCE_DATE': 'Date'}
-)
-fig2.update_traces(line=dict(color='#00b7eb', width=4))
-fig2.update_layout(height=500)
-st.plotly_chart(fig2, use_container_width=True)
+price_filtered = price_range[0] > min_price or price_range[1] < max_price
+st.plotly_chart(build_monthly_trend(filtered_df, daily_totals, filter_key, price_filtered), use_container_width=True)
 
 # 3. Distribution by Property Type (Box Plot)
-fig3 = px.box(
-    filtered_df,
-    x='PROP_TYPE_EN', y='TRANS_VALUE',
-    color='PROP_TYPE_EN',
-    color_discrete_sequence=px.colors.sequential.Blues_r,
-    title="Transaction Value Distribution by Property Type",
-    labels={'TRANS_VALUE': 'Value (AED)', 'PROP_TYPE_EN': 'Property Type'}
-)
-fig3.update_layout(xaxis_tickangle=-45, height=500, showlegend=False)
-st.plotly_chart(fig3, use_container_width=True)
+st.plotly_chart(build_prop_type_box(filtered_df, filter_key), use_container_width=True)
 
 # 4. Correlation Heatmap
 st.subheader("Feature Correlations")
 numeric_cols = ['TRANS_VALUE', 'PROCEDURE_AREA', 'ACTUAL_AREA', 'meter_price', 'roi_est']
-corr = filtered_df[numeric_cols].corr()
-fig4, ax = plt.subplots(figsize=(10, 7))
-sns.heatmap(corr, annot=True, cmap='Blues', fmt='.2f', linewidths=0.5, ax=ax, cbar_kws={"shrink": .8})
-ax.set_title("Key Variable Correlations")
-st.pyplot(fig4)
+corr = correlation_matrix(filtered_df[numeric_cols], filter_key)
+fig4 = px.imshow(
+    corr,
+    text_auto='.2f',
+    color_continuous_scale='Blues',
+    aspect='auto',
+    title="Key Variable Correlations"
+)
+fig4.update_layout(height=600)
+st.plotly_chart(fig4, use_container_width=True)
 
 # Download filtered data
 st.header("Export Data")
@@ -2,21 +2,48 @@ import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+import plotly.express as px
+from parquet_cache import read_or_build_sidecar
 
 st.set_page_config(page_title="Dubai Real Estate Dashboard", layout="wide", page_icon="🏙️")
 
+SIDECAR_VERSION = 1  # Bump whenever parse_properties changes the columns, dtypes or row order it produces
+
 # ---- LOAD & PREPARE DATA ----
-@st.cache_data
-def load_data():
-    df = pd.read_csv("dubai_properties.csv")
+def parse_properties(path):
+    df = pd.read_csv(path)
     df.dropna(subset=["Rent", "Area_in_sqft", "Location", "Posted_date"], inplace=True)
-    df["Location"] = df["Location"].str.strip().str.title()
+    df["Location"] = df["Location"].str.strip().str.title().astype("category")
     df["Posted_date"] = pd.to_datetime(df["Posted_date"], errors='coerce')
     df = df.dropna(subset=["Posted_date"])
     df["ROI"] = (df["Rent"] * 12 / df["Area_in_sqft"]) * 100  # Your ROI formula
+    # Narrow numeric columns: integer downcasting is range-checked and exact; floats go to
+    # float32 only when every value round-trips exactly
+    for c in ["Rent", "Area_in_sqft", "Beds", "Baths"]:
+        df[c] = pd.to_numeric(df[c], downcast="integer")
+    for c in ["ROI", "Rent_per_sqft"]:
+        narrowed = df[c].astype("float32")
+        if narrowed.astype(df[c].dtype).equals(df[c]):
+            df[c] = narrowed
     return df
 
-df = load_data()
+# The parsed frame is also kept as a typed parquet sidecar next to the CSV
+@st.cache_data
+def load_data(path="dubai_properties.csv"):
+    df = read_or_build_sidecar(path, lambda: parse_properties(path), SIDECAR_VERSION, source=path)
+    # Monthly rent totals per location, so the trend chart doesn't resample every listing on each rerun
+    monthly_rent = df.groupby([pd.Grouper(key="Posted_date", freq="ME"), "Location"], observed=True)["Rent"].agg(
+        rent_sum="sum", n="count")
+    # Numeric columns (any int/float width) for the heatmap, resolved once instead of on every rerun
+    numeric_cols = [c for c, dtype in df.dtypes.items() if pd.api.types.is_numeric_dtype(dtype)]
+    return df, monthly_rent, numeric_cols
+
+df, monthly_rent, NUMERIC_COLS = load_data()
+
+# Correlations are cached per selected-locations tuple; the underscored frame is not hashed
+@st.cache_data(max_entries=32)
+def correlation_matrix(_numeric_df, locations_key):
+    return _numeric_df.astype("float32").corr()
 
 st.title("🏙️ Dubai Real Estate Analytics Dashboard")
 st.markdown("#### Built by *AI Specialist in Progress* — Zahra")
@@ -28,6 +55,10 @@ selected_locations = st.sidebar.multiselect("Select Locations", location_list, d
 
 df_filtered = df[df["Location"].isin(selected_locations)]
 
+# Per-location stats in a single groupby pass, shared by the rankings below
+location_stats = df_filtered.groupby("Location", observed=True, sort=False).agg(
+    ROI=("ROI", "mean"), Rent=("Rent", "mean"), Rent_median=("Rent", "median"))
+
 # ---- KPIs ----
 st.markdown("---")
 st.header("📊 Key Metrics")
@@ -41,7 +72,7 @@ col4.metric("Total Listings", len(df_filtered))
 st.markdown("---")
 st.subheader("🏠 Area vs Rent")
 fig1, ax1 = plt.subplots(figsize=(10, 6))
-sns.scatterplot(data=df_filtered, x="Area_in_sqft", y="Rent", hue="Location", 
+sns.scatterplot(data=df_filtered, x="Area_in_sqft", y="Rent", hue="Location", hue_order=selected_locations,
                 palette="viridis", s=80, alpha=0.7, ax=ax1)
 ax1.set_xlabel("Area (sqft)")
 ax1.set_ylabel("Rent (AED)")
@@ -52,14 +83,14 @@ st.pyplot(fig1)
 # ---- 2. TOP ROI AREAS ----
 st.markdown("---")
 st.subheader("🏆 Top 10 ROI Locations")
-roi_by_area = df_filtered.groupby("Location")["ROI"].mean().sort_values(ascending=False).head(10)
+roi_by_area = location_stats["ROI"].nlargest(10)
 st.bar_chart(roi_by_area)
 
 # ---- 3. TOP RENT AREAS ----
 col_a, col_b = st.columns(2)
 with col_a:
     st.subheader("💰 Top 10 Expensive Locations")
-    avg_rent = df_filtered.groupby("Location")["Rent"].mean().sort_values(ascending=False).head(10)
+    avg_rent = location_stats["Rent"].nlargest(10)
     st.bar_chart(avg_rent)
 
 with col_b:
@@ -70,7 +101,9 @@ with col_b:
 # ---- 4. MONTHLY RENT TREND ----
 st.markdown("---")
 st.subheader("📈 Monthly Rent Trend (Last 12 Months)")
-monthly_trend = df_filtered.resample("ME", on="Posted_date")["Rent"].mean().tail(12)
+monthly_sel = monthly_rent[monthly_rent.index.get_level_values("Location").isin(selected_locations)]
+monthly_sel = monthly_sel.groupby(level="Posted_date").sum()
+monthly_trend = (monthly_sel["rent_sum"] / monthly_sel["n"]).asfreq("ME").tail(12)
 fig2, ax2 = plt.subplots(figsize=(12, 6))
 monthly_trend.plot(ax=ax2, linewidth=3, marker='o', color='#ff6b6b')
 ax2.set_title("Rent Trend Over Time", fontweight='bold')
@@ -81,19 +114,18 @@ st.pyplot(fig2)
 # ---- 5. CORRELATION HEATMAP ----
 st.markdown("---")
 st.subheader("🔗 Correlation Heatmap")
-numeric_df = df_filtered.select_dtypes(include=['int64', 'float64'])
-fig3, ax3 = plt.subplots(figsize=(12, 8))
-sns.heatmap(numeric_df.corr(), annot=True, cmap='coolwarm', linewidth=0.5, ax=ax3)
-ax3.set_title('Dubai Real Estate Market Correlations', fontweight='bold')
-st.pyplot(fig3)
+fig3 = px.imshow(correlation_matrix(df_filtered[NUMERIC_COLS], tuple(selected_locations)), text_auto=".2f", color_continuous_scale="RdBu_r",
+                 zmin=-1, zmax=1, aspect="auto", title="Dubai Real Estate Market Correlations")
+fig3.update_layout(height=700)
+st.plotly_chart(fig3, use_container_width=True)
 
 # ---- 6. RENT DISTRIBUTION BOXPLOT ----
 st.markdown("---")
 st.subheader("📦 Rent Distribution by Location")
-top_locations = df_filtered.groupby("Location")["Rent"].median().sort_values(ascending=False).head(15)
+top_locations = location_stats["Rent_median"].nlargest(15)
 df_top = df_filtered[df_filtered["Location"].isin(top_locations.index)]
 fig4, ax4 = plt.subplots(figsize=(15, 6))
-sns.boxplot(data=df_top, x="Location", y="Rent", ax=ax4)
+sns.boxplot(data=df_top, x="Location", y="Rent", order=top_locations.index, ax=ax4)
 plt.xticks(rotation=45, ha='right')
 ax4.set_title("Rent Distribution - Top Locations", fontweight='bold')
 st.pyplot(fig4)
@@ -101,10 +133,10 @@ st.pyplot(fig4)
 # ---- 7. ROI vs RENT SCATTER ----
 st.markdown("---")
 st.subheader("🎯 ROI vs Rent (Top Locations)")
-top_roi_locations = df_filtered.groupby("Location")["ROI"].mean().sort_values(ascending=False).head(10)
+top_roi_locations = roi_by_area
 df_top_roi = df_filtered[df_filtered["Location"].isin(top_roi_locations.index)]
 fig5, ax5 = plt.subplots(figsize=(12, 6))
-sns.scatterplot(data=df_top_roi, x="Rent", y="ROI", hue="Location", 
+sns.scatterplot(data=df_top_roi, x="Rent", y="ROI", hue="Location", hue_order=top_roi_locations.index,
                 palette="tab10", alpha=0.7, s=100, edgecolor="w", ax=ax5)
 ax5.set_xlabel("Rent (AED)")
 ax5.set_ylabel("ROI (%)")
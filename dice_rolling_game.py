@@ -1,5 +1,7 @@
 import random
 
+DICE_FACES = (1, 2, 3, 4, 5, 6)
+
 roll_count = 0
 
 while True:
@@ -8,11 +10,7 @@ while True:
     if choice == 'y':
         roll_count += 1
         choice_num = int(input("How many dice do you want to roll? "))
-        dice_result = []
-
-        for i in range(choice_num):
-            roll = random.randint(1, 6)
-            dice_result.append(roll)
+        dice_result = random.choices(DICE_FACES, k=choice_num)
 
         print("You Rolled:", dice_result)
         print(f"Total: {sum(dice_result)}")
@@ -1,16 +1,21 @@
 import random
+import re
+
+_INT_RE = re.compile(r'^[+-]?\d+$')
 
 random_num = random.randint(1, 100)
 while True:
-    try:
-        guessed_number = int(input("Guess the number between 1 and 100: "))
-        
-        if guessed_number > random_num:
-            print("Too high")
-        elif guessed_number < random_num:
-            print("Too low")
-        else:
-            print("Bravo, you did it right!")
-            break
-    except ValueError:
-        print("Please enter a valid number")
\ No newline at end of file
+    guess = input("Guess the number between 1 and 100: ").strip()
+    if not _INT_RE.match(guess):
+        print("Please enter a valid number")
+        continue
+
+    guessed_number = int(guess)
+
+    if guessed_number > random_num:
+        print("Too high")
+    elif guessed_number < random_num:
+        print("Too low")
+    else:
+        print("Bravo, you did it right!")
+        break
\ No newline at end of file
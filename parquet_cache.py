@@ -0,0 +1,36 @@
+import os
+import threading
+import time
+from contextlib import suppress
+
+import pandas as pd
+
+
+def read_or_build_sidecar(base_path, build_fn, version, source=None, max_age=None):
+    """Return the DataFrame cached at `<base_path>.v<version>.parquet`, or build and cache it with build_fn().
+
+    The cached file is reused while it is newer than `source` (if given) and younger than
+    `max_age` seconds (if given); bump `version` whenever build_fn's output changes.
+    """
+    parquet_path = f"{base_path}.v{version}.parquet"
+    if os.path.exists(parquet_path):
+        mtime = os.path.getmtime(parquet_path)
+        fresh = (source is None or mtime >= os.path.getmtime(source)) and \
+            (max_age is None or time.time() - mtime < max_age)
+        if fresh:
+            try:
+                return pd.read_parquet(parquet_path)
+            except (ImportError, OSError, ValueError):
+                pass  # Unreadable file (e.g. ArrowInvalid): rebuild it below
+
+    df = build_fn()
+    # Write to a temp file private to this process/thread and swap it in, so readers never see a partial file
+    tmp_path = f"{base_path}.v{version}.{os.getpid()}-{threading.get_ident()}.tmp.parquet"
+    try:
+        df.to_parquet(tmp_path, compression="zstd")
+        os.replace(tmp_path, parquet_path)
+    except (ImportError, OSError, ValueError):
+        # No parquet engine, read-only checkout or unserialisable column: serve the fresh frame uncached
+        with suppress(OSError):
+            os.remove(tmp_path)
+    return df